@@ -1,9 +1,11 @@
 import os
 import logging
 import json
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, g, session
+import hashlib
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, g, session, make_response
 from flask_babel import Babel, gettext as _
 from project_manager import ProjectManager
+from resource_limits import parse_limits
 
 # Setup logging
 logging.basicConfig(level=logging.DEBUG)
@@ -35,6 +37,36 @@ def get_locale():
 # Initialize Flask-Babel with the locale selector
 babel = Babel(app, locale_selector=get_locale)
 
+# Number of project cards rendered per dashboard page
+DASHBOARD_PAGE_SIZE = 24
+
+def get_project_query_args(default_per_page=None):
+    """
+    Read the project list filters, sorting and pagination from the query string
+    """
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', default_per_page or 0)) or None
+    except ValueError:
+        raise ValueError('page and per_page must be numbers')
+    if page < 1 or (per_page is not None and per_page < 1):
+        raise ValueError('page and per_page must be positive')
+    
+    order = request.args.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be 'asc' or 'desc'")
+    
+    fields = request.args.get('fields')
+    return {
+        'status': request.args.get('status') or None,
+        'search': request.args.get('q') or None,
+        'sort': request.args.get('sort', 'name'),
+        'order': order,
+        'page': page,
+        'per_page': per_page,
+        'fields': [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+    }
+
 @app.before_request
 def before_request():
     """
@@ -50,8 +82,14 @@ def index():
 @app.route('/dashboard')
 def dashboard():
     """Display the main dashboard page."""
-    projects = project_manager.get_all_projects()
-    return render_template('dashboard.html', projects=projects)
+    try:
+        query = get_project_query_args(default_per_page=DASHBOARD_PAGE_SIZE)
+        query['fields'] = None
+        result = project_manager.query_projects(**query)
+    except ValueError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('dashboard'))
+    return render_template('dashboard.html', projects=result['projects'], pagination=result, filters=query)
 
 @app.route('/project/add', methods=['GET', 'POST'])
 def add_project():
@@ -82,6 +120,20 @@ def add_project():
             flash(f'Port must be a valid number!', 'danger')
             return redirect(url_for('add_project'))
         
+        # Validate resource limits
+        try:
+            limits = parse_limits({
+                'cpu_affinity': request.form.get('cpu_affinity'),
+                'nice': request.form.get('nice'),
+                'memory_limit_mb': request.form.get('memory_limit_mb'),
+                'max_open_files': request.form.get('max_open_files'),
+                'rss_limit_mb': request.form.get('rss_limit_mb'),
+                'on_violation': request.form.get('on_violation')
+            })
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('add_project'))
+        
         # Check for port conflicts with existing projects
         projects = project_manager.get_all_projects()
         for project in projects:
@@ -90,7 +142,7 @@ def add_project():
                 return redirect(url_for('add_project'))
             
         # Add the project
-        success = project_manager.add_project(name, path, entry_file, port)
+        success = project_manager.add_project(name, path, entry_file, port, limits)
         
         if success:
             flash(f'Project {name} added successfully!', 'success')
@@ -109,18 +161,85 @@ def project_details(project_id):
         flash('Project not found!', 'danger')
         return redirect(url_for('dashboard'))
         
-    return render_template('project_details.html', project=project)
+    events = project_manager.events.query(project_id=project_id, limit=50)
+    stats = project_manager.events.stats(project_id)
+    return render_template('project_details.html', project=project, events=events, stats=stats)
 
 @app.route('/api/projects')
 def api_projects():
-    """API endpoint to get all projects and their status."""
+    """API endpoint to get all projects and their status.
+    
+    Supports filtering (status, q), sorting (sort, order), pagination (page, per_page)
+    and a field selector (fields). Pagination details are returned in X-Total-Count,
+    X-Page and X-Total-Pages headers so the body stays a plain list. Unchanged polls
+    sending If-None-Match get a 304 without the list being rebuilt.
+    """
     try:
-        projects = project_manager.get_all_projects()
-        return jsonify(projects)
+        query = get_project_query_args()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    
+    try:
+        etag = hashlib.sha1(
+            f"{project_manager.get_projects_etag()}?{request.query_string.decode()}".encode()
+        ).hexdigest()
+        if etag in request.if_none_match:
+            response = make_response('', 304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        
+        result = project_manager.query_projects(**query)
+        response = jsonify(result['projects'])
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Total-Count'] = str(result['total'])
+        response.headers['X-Page'] = str(result['page'])
+        response.headers['X-Total-Pages'] = str(result['pages'])
+        return response
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
     except Exception as e:
         logger.error(f"Error getting projects: {str(e)}")
         return jsonify({"success": False, "message": str(e)}), 500
 
+@app.route('/api/events')
+def api_events():
+    """API endpoint to query the lifecycle event log.
+    
+    Filters are project_id, event, since and until (UNIX timestamps). Events are
+    returned newest first; pass the smallest id seen as before_id for the next page.
+    """
+    try:
+        since = request.args.get('since', type=float)
+        until = request.args.get('until', type=float)
+        before_id = request.args.get('before_id', type=int)
+        limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+        events = project_manager.events.query(
+            project_id=request.args.get('project_id'),
+            event=request.args.get('event'),
+            since=since,
+            until=until,
+            before_id=before_id,
+            limit=limit
+        )
+        return jsonify({"success": True, "events": events})
+    except Exception as e:
+        logger.error(f"Error querying events: {str(e)}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/api/project/<project_id>/stats')
+def api_project_stats(project_id):
+    """API endpoint to get uptime, MTTR and start duration statistics of a project."""
+    try:
+        since = request.args.get('since', type=float)
+        until = request.args.get('until', type=float)
+        stats = project_manager.events.stats(project_id, since=since, until=until)
+        return jsonify({"success": True, "stats": stats})
+    except Exception as e:
+        logger.error(f"Error getting stats for project {project_id}: {str(e)}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
 @app.route('/api/project/<project_id>/start', methods=['POST'])
 def api_start_project(project_id):
     """API endpoint to start a project."""
@@ -141,6 +260,46 @@ def api_stop_project(project_id):
         logger.error(f"Error stopping project {project_id}: {str(e)}")
         return jsonify({"success": False, "message": str(e)}), 500
 
+@app.route('/api/project/<project_id>/rolling-restart', methods=['GET', 'POST'])
+def api_rolling_restart_project(project_id):
+    """API endpoint to start a rolling restart in the background, or poll its progress and result."""
+    try:
+        if request.method == 'POST':
+            result = project_manager.start_rolling_restart(project_id)
+            return jsonify(result), 202 if result['success'] else 200
+        return jsonify(project_manager.get_rolling_restart(project_id))
+    except Exception as e:
+        logger.error(f"Error restarting project {project_id}: {str(e)}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/api/project/<project_id>/limits', methods=['GET', 'POST'])
+def api_project_limits(project_id):
+    """API endpoint to get or update the resource limits of a project."""
+    try:
+        if request.method == 'POST':
+            result = project_manager.set_project_limits(project_id, request.get_json(silent=True) or {})
+        else:
+            result = project_manager.get_project_limits(project_id)
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Error handling resource limits for project {project_id}: {str(e)}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/api/project/<project_id>/warmup', methods=['GET', 'POST'])
+def api_project_warmup(project_id):
+    """API endpoint to run a warm-up of a project or get the last result."""
+    try:
+        if request.method == 'POST':
+            return jsonify(project_manager.warm_up(project_id))
+        
+        project = project_manager.get_project(project_id)
+        if not project:
+            return jsonify({"success": False, "message": "Project not found"}), 404
+        return jsonify({"success": True, "warmup": project.get('warmup')})
+    except Exception as e:
+        logger.error(f"Error warming up project {project_id}: {str(e)}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
 @app.route('/api/project/<project_id>/logs')
 def api_project_logs(project_id):
     """API endpoint to get the logs for a project."""
@@ -195,6 +354,21 @@ def api_project_dependencies(project_id):
         logger.error(f"Error checking dependencies for project {project_id}: {str(e)}")
         return jsonify({"success": False, "message": str(e)}), 500
 
+@app.route('/dependencies')
+def dependencies_overview():
+    """Display the dependency status of all projects."""
+    result = project_manager.check_all_dependencies()
+    return render_template('dependencies.html', projects=result['projects'], totals=result['totals'])
+
+@app.route('/api/dependencies')
+def api_all_dependencies():
+    """API endpoint to get the dependency status of all projects."""
+    try:
+        return jsonify(project_manager.check_all_dependencies())
+    except Exception as e:
+        logger.error(f"Error checking dependencies: {str(e)}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
 @app.route('/api/project/<project_id>/install-dependencies', methods=['POST'])
 def api_install_dependencies(project_id):
     """API endpoint to install dependencies for a project."""
@@ -0,0 +1,440 @@
+import os
+import re
+import glob
+import json
+import hashlib
+import logging
+import subprocess
+import time
+import tomllib
+from threading import Lock
+from packaging.requirements import Requirement, InvalidRequirement
+from packaging.specifiers import SpecifierSet, InvalidSpecifier
+from packaging.utils import canonicalize_name
+from packaging.version import Version, InvalidVersion
+
+logger = logging.getLogger(__name__)
+
+# Dependency files we understand, in the order they are reported
+DEPENDENCY_FILES = ('requirements.txt', 'pyproject.toml', 'Pipfile', 'poetry.lock')
+
+# requirements.txt options that pull in packages we cannot analyze
+INCLUDE_OPTIONS = re.compile(r'^(-r|--requirement|-e|--editable)\b')
+
+# Per-requirement options such as --hash=sha256:... that may follow a requirement
+REQUIREMENT_OPTIONS = re.compile(r'\s--[\w-]+(?:[= ]\S+)?')
+
+# Run in the project's interpreter: prints the installed distributions and the environment
+# markers are evaluated against, as JSON. The interpreter may not have packaging installed,
+# so the marker environment is built the way packaging.markers.default_environment does.
+INSTALLED_SCRIPT = '''
+import json
+import os
+import platform
+import sys
+from importlib import metadata
+version = sys.implementation.version
+implementation_version = "{0.major}.{0.minor}.{0.micro}".format(version)
+if version.releaselevel != "final":
+    implementation_version += version.releaselevel[0] + str(version.serial)
+environment = {
+    "implementation_name": sys.implementation.name,
+    "implementation_version": implementation_version,
+    "os_name": os.name,
+    "platform_machine": platform.machine(),
+    "platform_release": platform.release(),
+    "platform_system": platform.system(),
+    "platform_version": platform.version(),
+    "python_full_version": platform.python_version(),
+    "platform_python_implementation": platform.python_implementation(),
+    "python_version": ".".join(platform.python_version_tuple()[:2]),
+    "sys_platform": sys.platform,
+}
+installed = {d.metadata["Name"]: d.version for d in metadata.distributions() if d.metadata["Name"]}
+print(json.dumps({"installed": installed, "environment": environment}))
+'''
+
+
+def parse_requirements(text, source='requirements.txt', unparsed=None):
+    """Parse requirements.txt content into dependency specs.
+
+    Continuation lines are joined and per-requirement options such as --hash
+    are dropped. Global options such as --index-url are skipped. Lines that
+    cannot be analyzed, such as -r, -e, paths and URLs, are added to unparsed.
+    """
+    specs = []
+    for line in re.sub(r'\\\r?\n', ' ', text).splitlines():
+        line = line.split(' #', 1)[0].strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('-'):
+            if INCLUDE_OPTIONS.match(line) and unparsed is not None:
+                unparsed.append(line)
+            continue
+        spec = _spec_from_string(REQUIREMENT_OPTIONS.sub('', line).strip(), source, unparsed=unparsed)
+        if spec:
+            specs.append(spec)
+    return specs
+
+
+def parse_pyproject(text, source='pyproject.toml', unparsed=None):
+    """Parse PEP 621 and Poetry dependencies from pyproject.toml content."""
+    data = tomllib.loads(text)
+    specs = []
+
+    project = data.get('project', {})
+    for line in project.get('dependencies', []):
+        spec = _spec_from_string(line, source, unparsed=unparsed)
+        if spec:
+            specs.append(spec)
+    for extra, lines in project.get('optional-dependencies', {}).items():
+        for line in lines:
+            spec = _spec_from_string(line, f'{source} [{extra}]', optional=True, unparsed=unparsed)
+            if spec:
+                specs.append(spec)
+
+    poetry = data.get('tool', {}).get('poetry', {})
+    specs.extend(_specs_from_table(poetry.get('dependencies', {}), source, poetry_style=True))
+    for group, table in poetry.get('group', {}).items():
+        specs.extend(_specs_from_table(table.get('dependencies', {}), f'{source} [{group}]',
+                                       poetry_style=True, optional=True))
+    return specs
+
+
+def parse_pipfile(text, source='Pipfile', unparsed=None):
+    """Parse the packages and dev-packages of Pipfile content."""
+    data = tomllib.loads(text)
+    specs = _specs_from_table(data.get('packages', {}), source)
+    specs.extend(_specs_from_table(data.get('dev-packages', {}), f'{source} [dev]', optional=True))
+    return specs
+
+
+def parse_poetry_lock(text, source='poetry.lock', unparsed=None):
+    """Parse the locked package versions of poetry.lock content."""
+    data = tomllib.loads(text)
+    specs = []
+    for package in data.get('package', []):
+        if 'name' not in package or 'version' not in package:
+            continue
+        specs.append(_make_spec(package['name'], f"=={package['version']}", source, locked=True))
+    return specs
+
+
+PARSERS = {
+    'requirements.txt': parse_requirements,
+    'pyproject.toml': parse_pyproject,
+    'Pipfile': parse_pipfile,
+    'poetry.lock': parse_poetry_lock
+}
+
+
+def _make_spec(name, specifier, source, marker=None, optional=False, locked=False):
+    return {
+        'name': name,
+        'key': canonicalize_name(name),
+        'specifier': specifier,
+        'marker': marker,
+        'source': source,
+        'optional': optional,
+        'locked': locked
+    }
+
+
+def _spec_from_string(line, source, optional=False, unparsed=None):
+    try:
+        requirement = Requirement(line)
+    except InvalidRequirement:
+        logger.debug(f"Skipping unparsable requirement '{line}' in {source}")
+        if unparsed is not None:
+            unparsed.append(line)
+        return None
+    return _make_spec(requirement.name, str(requirement.specifier), source,
+                      marker=str(requirement.marker) if requirement.marker else None,
+                      optional=optional)
+
+
+def _specs_from_table(table, source, poetry_style=False, optional=False):
+    """Parse a TOML dependency table such as Pipfile [packages] or Poetry dependencies."""
+    specs = []
+    for name, value in table.items():
+        if name.lower() == 'python':
+            continue
+        marker = None
+        is_optional = optional
+        if isinstance(value, dict):
+            marker = value.get('markers')
+            is_optional = optional or value.get('optional', False)
+            value = value.get('version', '*')
+        elif isinstance(value, list):
+            # Poetry allows several constraints for different platforms
+            value = '*'
+        value = str(value).strip()
+        specifier = _poetry_constraint(value) if poetry_style else ('' if value == '*' else value)
+        try:
+            SpecifierSet(specifier)
+        except InvalidSpecifier:
+            logger.debug(f"Skipping unparsable constraint '{value}' for {name} in {source}")
+            specifier = ''
+        specs.append(_make_spec(name, specifier, source, marker=marker, optional=is_optional))
+    return specs
+
+
+def _poetry_constraint(value):
+    """Translate Poetry's ^ and ~ constraints into PEP 440 specifiers."""
+    parts = []
+    for constraint in value.split(','):
+        constraint = constraint.strip()
+        if not constraint or constraint == '*':
+            continue
+        if constraint[0] in '^~' and not constraint.startswith('~='):
+            operator, version = constraint[0], constraint[1:].strip()
+            numbers = [int(number) for number in version.split('.') if number.isdigit()]
+            if not numbers:
+                continue
+            if operator == '^':
+                # Bump the first non-zero component
+                index = next((i for i, number in enumerate(numbers) if number != 0), len(numbers) - 1)
+            else:
+                index = min(1, len(numbers) - 1) if len(numbers) > 1 else 0
+            upper = numbers[:index] + [numbers[index] + 1]
+            parts.append(f">={version}")
+            parts.append(f"<{'.'.join(str(number) for number in upper)}")
+        elif constraint[0].isdigit():
+            parts.append(f"=={constraint}")
+        else:
+            parts.append(constraint)
+    return ','.join(parts)
+
+
+def _satisfies(version, specifier):
+    """Check whether a version satisfies a specifier. Returns None when it cannot be decided."""
+    if not specifier:
+        return True
+    try:
+        return SpecifierSet(specifier).contains(Version(version), prereleases=True)
+    except (InvalidSpecifier, InvalidVersion):
+        return None
+
+
+class DependencyAnalyzer:
+    """Compares the declared dependencies of projects with what their interpreter has installed.
+
+    Parsed files are cached by content hash and installed packages by the state
+    of the venv's site-packages, so repeated checks do not re-read or re-run anything.
+    """
+
+    # How long the installed packages of an interpreter without a venv are trusted
+    SYSTEM_CACHE_SECONDS = 60
+
+    def __init__(self):
+        """Initialize the caches."""
+        self.lock = Lock()
+        self.file_cache = {}
+        self.installed_cache = {}
+        self.analysis_cache = {}
+
+    def analyze(self, path, python_path):
+        """Analyze the dependencies of a project directory."""
+        files = {}
+        for file_name in DEPENDENCY_FILES:
+            file_path = os.path.join(path, file_name)
+            if os.path.isfile(file_path):
+                files[file_name] = self._file_digest(file_path)
+
+        if not files:
+            return {'found': False, 'message': 'No dependency files found'}
+
+        installed_key = self._installed_fingerprint(path, python_path)
+        cache_key = (path, tuple(sorted(files.items())), installed_key)
+        with self.lock:
+            if cache_key in self.analysis_cache:
+                return dict(self.analysis_cache[cache_key], cached=True)
+
+        specs = []
+        errors = {}
+        unparsed = {}
+        for file_name, digest in files.items():
+            try:
+                file_specs, file_unparsed = self._parse_file(os.path.join(path, file_name), file_name, digest)
+                specs.extend(file_specs)
+                if file_unparsed:
+                    unparsed[file_name] = file_unparsed
+            except Exception as e:
+                logger.error(f"Error parsing {file_name} in {path}: {e}")
+                errors[file_name] = str(e)
+
+        installed, environment = self._installed_packages(python_path, installed_key)
+        packages = self._compare(specs, installed, environment)
+
+        summary = {'total': len(packages), 'ok': 0, 'missing': 0, 'outdated': 0, 'conflicting': 0, 'unknown': 0}
+        for package in packages:
+            summary[package['status']] += 1
+
+        result = {
+            'found': True,
+            'files': list(files),
+            'errors': errors,
+            'unparsed': unparsed,
+            'requirements': [
+                f"{spec['name']}{spec['specifier']}" for spec in specs
+                if spec['source'] == 'requirements.txt'
+            ],
+            'packages': packages,
+            'summary': summary,
+            # Lines we could not analyze may name anything, so leave those to pip
+            'install_needed': summary['missing'] > 0 or summary['outdated'] > 0 or bool(unparsed),
+            'installed_count': len(installed) if installed is not None else None,
+            'analyzed': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'cached': False
+        }
+
+        with self.lock:
+            # Only keep the latest analysis of each project
+            for key in [key for key in self.analysis_cache if key[0] == path]:
+                del self.analysis_cache[key]
+            self.analysis_cache[cache_key] = result
+        return result
+
+    def invalidate(self, path=None):
+        """Forget cached installed packages and analyses, e.g. after running pip."""
+        with self.lock:
+            self.installed_cache.clear()
+            for key in [key for key in self.analysis_cache if path is None or key[0] == path]:
+                del self.analysis_cache[key]
+
+    def _file_digest(self, file_path):
+        with open(file_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def _parse_file(self, file_path, file_name, digest):
+        with self.lock:
+            cached = self.file_cache.get(file_path)
+            if cached and cached[0] == digest:
+                return cached[1], cached[2]
+
+        unparsed = []
+        with open(file_path, 'r', encoding='utf-8') as f:
+            specs = PARSERS[file_name](f.read(), unparsed=unparsed)
+
+        with self.lock:
+            self.file_cache[file_path] = (digest, specs, unparsed)
+        return specs, unparsed
+
+    def _installed_fingerprint(self, path, python_path):
+        """Get a value that changes whenever packages are installed into the project's interpreter."""
+        site_packages = glob.glob(os.path.join(path, 'venv', 'lib', 'python*', 'site-packages'))
+        if site_packages:
+            return (python_path,) + tuple((directory, os.stat(directory).st_mtime_ns) for directory in site_packages)
+        return (python_path, int(time.time() // self.SYSTEM_CACHE_SECONDS))
+
+    def _installed_packages(self, python_path, fingerprint):
+        """Get the installed distributions of an interpreter, keyed by normalized name, and its marker environment.
+
+        Returns (None, None) when the interpreter cannot be queried.
+        """
+        with self.lock:
+            if fingerprint in self.installed_cache:
+                return self.installed_cache[fingerprint]
+
+        try:
+            process = subprocess.run(
+                [python_path, '-c', INSTALLED_SCRIPT],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=60
+            )
+            data = json.loads(process.stdout)
+            installed = {canonicalize_name(name): version for name, version in data['installed'].items()}
+            environment = data['environment']
+        except Exception as e:
+            logger.error(f"Error listing installed packages of {python_path}: {e}")
+            return None, None
+
+        with self.lock:
+            self.installed_cache[fingerprint] = (installed, environment)
+        return installed, environment
+
+    def _compare(self, specs, installed, environment=None):
+        """Merge the specs per package and compare them with the installed versions.
+
+        Markers are evaluated against the given environment of the project's
+        interpreter, or the dashboard's own when it is None.
+        """
+        packages = {}
+        for spec in specs:
+            package = packages.setdefault(spec['key'], {
+                'name': spec['name'],
+                'required': [],
+                'locked': None,
+                'installed': None,
+                'optional': True
+            })
+            if spec['locked']:
+                package['locked'] = spec['specifier'][2:]
+            else:
+                package['required'].append({
+                    'source': spec['source'],
+                    'specifier': spec['specifier'],
+                    'marker': spec['marker']
+                })
+                package['optional'] = package['optional'] and spec['optional']
+
+        result = []
+        for key, package in packages.items():
+            # Lock files list every transitive package, only report those something asks for
+            if not package['required']:
+                continue
+            if installed is not None:
+                package['installed'] = installed.get(key)
+            package['status'], package['message'] = self._package_status(package, installed, environment)
+            result.append(package)
+
+        order = {'conflicting': 0, 'missing': 1, 'outdated': 2, 'unknown': 3, 'ok': 4}
+        result.sort(key=lambda package: (order[package['status']], package['name'].lower()))
+        return result
+
+    def _package_status(self, package, installed, environment=None):
+        specifiers = [requirement['specifier'] for requirement in package['required'] if requirement['specifier']]
+
+        # Different files pinning different exact versions can never all be satisfied
+        pins = {specifier[2:] for specifier in specifiers if specifier.startswith('==') and ',' not in specifier}
+        if len(pins) > 1:
+            return 'conflicting', f"Pinned to different versions: {', '.join(sorted(pins))}"
+
+        if package['locked']:
+            for requirement in package['required']:
+                if _satisfies(package['locked'], requirement['specifier']) is False:
+                    return 'conflicting', (f"Locked version {package['locked']} does not satisfy "
+                                           f"{requirement['specifier']} from {requirement['source']}")
+
+        if installed is None:
+            return 'unknown', 'Could not list the installed packages'
+
+        if not package['installed']:
+            if all(self._marker_excludes(requirement['marker'], environment) for requirement in package['required']):
+                return 'ok', 'Not needed on this platform'
+            if package['optional']:
+                return 'ok', 'Optional and not installed'
+            return 'missing', 'Not installed'
+
+        for specifier in specifiers:
+            satisfied = _satisfies(package['installed'], specifier)
+            if satisfied is False:
+                return 'outdated', f"Installed {package['installed']} does not satisfy {specifier}"
+            if satisfied is None:
+                return 'unknown', f"Cannot compare {package['installed']} with {specifier}"
+
+        if package['locked'] and package['locked'] != package['installed']:
+            return 'outdated', f"Installed {package['installed']} but {package['locked']} is locked"
+
+        return 'ok', f"Installed {package['installed']}"
+
+    def _marker_excludes(self, marker, environment=None):
+        if not marker:
+            return False
+        try:
+            return not Requirement(f'placeholder; {marker}').marker.evaluate(environment)
+        except Exception:
+            return False
@@ -0,0 +1,195 @@
+import json
+import logging
+import sqlite3
+import time
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+# Events that mark a project's process going up or down
+START_EVENTS = ('started',)
+END_EVENTS = ('stopped', 'exited', 'crashed')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    project_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    pid INTEGER,
+    exit_code INTEGER,
+    duration REAL,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS idx_events_project_ts ON events (project_id, ts);
+CREATE INDEX IF NOT EXISTS idx_events_project_event_ts ON events (project_id, event, ts);
+CREATE INDEX IF NOT EXISTS idx_events_project_event_duration ON events (project_id, event, duration);
+'''
+
+
+class EventStore:
+    """Append-only SQLite log of project lifecycle events.
+
+    Rows are never updated. Every statistic is answered from one of the indexes
+    on (project_id, event, ts) or (project_id, event, duration), so the cost
+    depends on the events of one project in the window, not on the whole log.
+    """
+
+    DB_FILE = 'flask_dashboard_events.db'
+
+    def __init__(self, path=None):
+        """Open the event database, creating it if needed."""
+        self.lock = Lock()
+        self.db = sqlite3.connect(path or self.DB_FILE, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with self.lock:
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.executescript(SCHEMA)
+            self.db.commit()
+
+    def record(self, project_id, event, pid=None, exit_code=None, duration=None, ts=None, **details):
+        """Append an event. Extra keyword arguments are stored as JSON details.
+
+        The event is stamped with the current time unless ts gives the time it happened.
+        """
+        with self.lock:
+            self.db.execute(
+                'INSERT INTO events (ts, project_id, event, pid, exit_code, duration, details) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (ts if ts is not None else time.time(), project_id, event, pid, exit_code, duration,
+                 json.dumps(details) if details else None)
+            )
+            self.db.commit()
+
+    def query(self, project_id=None, event=None, since=None, until=None, before_id=None, limit=100):
+        """Get events, newest first. Pass the smallest id seen as before_id to page back."""
+        conditions = []
+        params = []
+        for column, operator, value in (('project_id', '=', project_id), ('event', '=', event),
+                                        ('ts', '>=', since), ('ts', '<', until), ('id', '<', before_id)):
+            if value is not None:
+                conditions.append(f'{column} {operator} ?')
+                params.append(value)
+
+        sql = 'SELECT * FROM events'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY ts DESC, id DESC LIMIT ?'
+        params.append(limit)
+
+        with self.lock:
+            rows = self.db.execute(sql, params).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def last_event(self, project_id, events=None):
+        """Get the most recent of the given events of a project, or of any event, or None."""
+        sql = 'SELECT * FROM events WHERE project_id = ?'
+        params = (project_id,)
+        if events:
+            sql += f" AND event IN ({', '.join('?' for _ in events)})"
+            params += tuple(events)
+        with self.lock:
+            row = self.db.execute(sql + ' ORDER BY ts DESC, id DESC LIMIT 1', params).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def stats(self, project_id, since=None, until=None):
+        """Get uptime, crash, recovery and start duration statistics of a project.
+
+        Uptime is the share of the window the project was running. MTTR is the
+        mean time from a crash until the project was serving again. Start
+        durations are the time from launch until the port accepted connections.
+        """
+        until = until or time.time()
+        since = since if since is not None else until - 24 * 60 * 60
+        window = until - since
+
+        with self.lock:
+            uptime = self._uptime(project_id, since, until)
+            counts = dict(self.db.execute(
+                'SELECT event, COUNT(*) FROM events WHERE project_id = ? AND event IN (?, ?, ?) '
+                'AND ts >= ? AND ts < ? GROUP BY event',
+                (project_id, 'started', 'crashed', 'restarted', since, until)
+            ).fetchall())
+
+            # For each crash, the first time the project was serving again
+            recovery = self.db.execute(
+                'SELECT AVG(recovered - ts), COUNT(recovered) FROM ('
+                '  SELECT c.ts, (SELECT MIN(r.ts) FROM events r WHERE r.project_id = c.project_id'
+                '                AND r.event = ? AND r.ts > c.ts) AS recovered'
+                '  FROM events c WHERE c.project_id = ? AND c.event = ? AND c.ts >= ? AND c.ts < ?'
+                ')',
+                ('ready', project_id, 'crashed', since, until)
+            ).fetchone()
+
+            percentiles = self._percentiles(project_id, 'ready', since, until, (50, 90, 99))
+
+        return {
+            'since': since,
+            'until': until,
+            'uptime_seconds': round(uptime, 1),
+            'uptime_percent': round(uptime / window * 100, 2) if window > 0 else None,
+            'starts': counts.get('started', 0),
+            'crashes': counts.get('crashed', 0),
+            'rolling_restarts': counts.get('restarted', 0),
+            'mttr_seconds': round(recovery[0], 2) if recovery[0] is not None else None,
+            'recoveries': recovery[1],
+            'start_duration_seconds': percentiles
+        }
+
+    def _uptime(self, project_id, since, until):
+        """Sum the running intervals of a project that overlap a window. The caller must hold the lock."""
+        lifecycle = START_EVENTS + END_EVENTS
+        placeholders = ', '.join('?' for _ in lifecycle)
+
+        # Whether the project was already running when the window opened
+        previous = self.db.execute(
+            f'SELECT event FROM events WHERE project_id = ? AND event IN ({placeholders}) AND ts < ? '
+            f'ORDER BY ts DESC, id DESC LIMIT 1',
+            (project_id,) + lifecycle + (since,)
+        ).fetchone()
+        running_since = since if previous and previous['event'] in START_EVENTS else None
+
+        uptime = 0.0
+        rows = self.db.execute(
+            f'SELECT ts, event FROM events WHERE project_id = ? AND event IN ({placeholders}) '
+            f'AND ts >= ? AND ts < ? ORDER BY ts, id',
+            (project_id,) + lifecycle + (since, until)
+        )
+        for row in rows:
+            if row['event'] in START_EVENTS:
+                if running_since is None:
+                    running_since = row['ts']
+            elif running_since is not None:
+                uptime += row['ts'] - running_since
+                running_since = None
+
+        if running_since is not None:
+            uptime += until - running_since
+        return uptime
+
+    def _percentiles(self, project_id, event, since, until, percentiles):
+        """Get duration percentiles by seeking into the duration index. The caller must hold the lock."""
+        condition = 'project_id = ? AND event = ? AND duration IS NOT NULL AND ts >= ? AND ts < ?'
+        params = (project_id, event, since, until)
+        count = self.db.execute(f'SELECT COUNT(*) FROM events WHERE {condition}', params).fetchone()[0]
+
+        result = {}
+        for percentile in percentiles:
+            if not count:
+                result[f'p{percentile}'] = None
+                continue
+            # Nearest-rank percentile
+            offset = max(0, -(-percentile * count // 100) - 1)
+            row = self.db.execute(
+                f'SELECT duration FROM events WHERE {condition} ORDER BY duration LIMIT 1 OFFSET ?',
+                params + (offset,)
+            ).fetchone()
+            result[f'p{percentile}'] = round(row[0], 3)
+        return result
+
+    def _row_to_dict(self, row):
+        event = dict(row)
+        event['details'] = json.loads(event['details']) if event['details'] else {}
+        event['time'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(event['ts']))
+        return event
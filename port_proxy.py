@@ -0,0 +1,205 @@
+import socket
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def find_free_port():
+    """Ask the OS for a free local port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def port_is_open(port, host='127.0.0.1', timeout=0.5):
+    """Check whether something accepts TCP connections on a port."""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def wait_for_port(port, timeout=30, process=None, interval=0.1):
+    """Wait until a port accepts connections.
+
+    Gives up early if the given process exits while we are waiting.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            return False
+        if port_is_open(port):
+            return True
+        time.sleep(interval)
+    return False
+
+
+class PortProxy:
+    """Forwards TCP connections from a public port to a backend port that can be switched."""
+
+    BUFFER_SIZE = 65536
+
+    def __init__(self, listen_port, backend_port, host='0.0.0.0', bind_timeout=5):
+        """Bind the public port and start accepting connections."""
+        self.listen_port = listen_port
+        self.backend_port = backend_port
+        self.lock = threading.Lock()
+        self.active = {}
+        self.dropped = 0
+        self.running = True
+
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        # The previous owner of the port may still be shutting down
+        deadline = time.time() + bind_timeout
+        while True:
+            try:
+                self.server.bind((host, listen_port))
+                break
+            except OSError:
+                if time.time() >= deadline:
+                    self.server.close()
+                    raise
+                time.sleep(0.05)
+        self.server.listen(128)
+
+        accept_thread = threading.Thread(target=self._accept_loop)
+        accept_thread.daemon = True
+        accept_thread.start()
+
+    def switch_backend(self, backend_port):
+        """Send new connections to a different backend port."""
+        with self.lock:
+            self.backend_port = backend_port
+
+    def active_connections(self, backend_port):
+        """Get the number of open connections to a backend port."""
+        with self.lock:
+            return self.active.get(backend_port, 0)
+
+    def wait_for_drain(self, backend_port, timeout=10):
+        """Wait until a backend port has no open connections left."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.active_connections(backend_port) == 0:
+                return True
+            time.sleep(0.1)
+        return self.active_connections(backend_port) == 0
+
+    def close(self):
+        """Stop accepting connections and release the public port."""
+        self.running = False
+        try:
+            # Closing alone does not wake a thread blocked in accept(), which keeps the port bound
+            self.server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.server.close()
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                break
+            handler = threading.Thread(target=self._handle, args=(client,))
+            handler.daemon = True
+            handler.start()
+
+    def _handle(self, client):
+        # Count the connection before connecting so a drain cannot miss it
+        with self.lock:
+            backend_port = self.backend_port
+            self.active[backend_port] = self.active.get(backend_port, 0) + 1
+
+        try:
+            upstream = socket.create_connection(('127.0.0.1', backend_port), timeout=5)
+            upstream.settimeout(None)
+        except OSError as e:
+            logger.warning(f"Proxy on port {self.listen_port} could not reach backend {backend_port}: {e}")
+            with self.lock:
+                self.active[backend_port] -= 1
+                self.dropped += 1
+            client.close()
+            return
+
+        try:
+            forward = threading.Thread(target=self._pipe, args=(client, upstream))
+            forward.daemon = True
+            forward.start()
+            self._pipe(upstream, client)
+            forward.join()
+        finally:
+            client.close()
+            upstream.close()
+            with self.lock:
+                self.active[backend_port] -= 1
+
+    def _pipe(self, source, destination):
+        try:
+            while True:
+                data = source.recv(self.BUFFER_SIZE)
+                if not data:
+                    break
+                destination.sendall(data)
+        except OSError:
+            pass
+        finally:
+            try:
+                destination.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+
+class AvailabilityProbe:
+    """Repeatedly connects to a port and records how long it was unreachable."""
+
+    def __init__(self, port, interval=0.05):
+        """Create a probe for a port. Call start() to begin probing."""
+        self.port = port
+        self.interval = interval
+        self.probes = 0
+        self.failures = 0
+        self.longest_outage = 0.0
+        self._outage_started = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    def start(self):
+        """Start probing in the background."""
+        self._thread.start()
+
+    def stop(self):
+        """Stop probing and return the measurements. Safe to call more than once."""
+        self._stop.set()
+        self._thread.join()
+        if self._outage_started is not None:
+            self._end_outage(time.time())
+        return {
+            'probes': self.probes,
+            'failed_probes': self.failures,
+            'downtime_ms': round(self.longest_outage * 1000, 1)
+        }
+
+    def _end_outage(self, now):
+        self.longest_outage = max(self.longest_outage, now - self._outage_started)
+        self._outage_started = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            reachable = port_is_open(self.port, timeout=self.interval * 4)
+            now = time.time()
+            self.probes += 1
+            if reachable:
+                if self._outage_started is not None:
+                    self._end_outage(now)
+            else:
+                self.failures += 1
+                if self._outage_started is None:
+                    self._outage_started = now
+            self._stop.wait(self.interval)
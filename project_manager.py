@@ -5,9 +5,17 @@ import subprocess
 import signal
 import logging
 import time
+import hashlib
 import yaml
+import threading
 from threading import Lock
 import psutil
+from port_proxy import PortProxy, AvailabilityProbe, find_free_port
+from warmup import run_warmup
+from dependency_analyzer import DependencyAnalyzer
+from event_store import EventStore, START_EVENTS, END_EVENTS
+from resource_limits import (parse_limits, create_cgroup, apply_limits, cgroup_is_empty, remove_cgroup,
+                             read_oom_kills, get_rss_mb)
 
 logger = logging.getLogger(__name__)
 
@@ -16,13 +24,58 @@ class ProjectManager:
     
     CONFIG_FILE = 'flask_dashboard_config.yaml'
     
+    # Fields that can be used to sort the project list
+    SORT_FIELDS = ('name', 'status', 'port', 'added_date')
+    
+    # Seconds between resource limit checks, and how many violations to keep per project
+    WATCHDOG_INTERVAL = 5
+    MAX_VIOLATIONS = 10
+    
+    # How many times a project may be restarted for going over its RSS budget within
+    # the window before it is stopped instead, so it cannot end up in a restart loop
+    MAX_LIMIT_RESTARTS = 3
+    LIMIT_RESTART_WINDOW = 10 * 60
+    
+    # Seconds between scheduled warm-ups of each project. Off by default, since a warm-up
+    # runs the module-level code of every project's entry imports
+    WARMUP_INTERVAL = int(os.environ.get('FLASK_DASHBOARD_WARMUP_INTERVAL', 0))
+    
+    # How long to wait for a started project to accept connections before giving up on a 'ready' event
+    READY_TIMEOUT = 60
+    
     def __init__(self):
         """Initialize the project manager."""
         self.projects = {}
         self.processes = {}
         self.logs = {}
+        self.proxies = {}
+        self.restarting = set()
+        # Result of the last background rolling restart of each project, None while it runs
+        self.restart_results = {}
+        # Cgroup of each instance by pid, and the OOM kills seen in each cgroup
+        self.cgroups = {}
+        self.oom_kills = {}
+        self.limit_restarts = {}
+        # Pid of each project's instance that is currently over its RSS budget
+        self.over_budget = {}
+        self.warming = set()
+        self.dependency_analyzer = DependencyAnalyzer()
+        self.events = EventStore()
+        self.started_at = {}
         self.lock = Lock()
+        # Bumped on every saved change, used to build cheap ETags for the project list
+        self.version = 0
         self.load_config()
+        
+        # Watch running projects for resource limit violations
+        watchdog_thread = threading.Thread(target=self._watchdog)
+        watchdog_thread.daemon = True
+        watchdog_thread.start()
+        
+        if self.WARMUP_INTERVAL > 0:
+            warmup_thread = threading.Thread(target=self._warmup_scheduler)
+            warmup_thread.daemon = True
+            warmup_thread.start()
     
     def load_config(self):
         """Load project configuration from YAML file."""
@@ -36,6 +89,8 @@ class ProjectManager:
                 # Check for any processes that might still be running from a previous session
                 for project_id, project in self.projects.items():
                     self.update_status(project_id)
+                    self._restore_proxy(project_id)
+                    self._close_stale_run(project_id)
             else:
                 # Create empty config if it doesn't exist
                 self.save_config()
@@ -45,9 +100,47 @@ class ProjectManager:
             self.projects = {}
             self.save_config()
     
+    def _restore_proxy(self, project_id):
+        """Put the proxy back in front of a project left on a standby port by a rolling restart."""
+        project = self.projects[project_id]
+        if 'backend_port' not in project:
+            return
+        if project['status'] != 'running':
+            del project['backend_port']
+            return
+        try:
+            self.proxies[project_id] = PortProxy(int(project['port']), project['backend_port'])
+        except OSError as e:
+            logger.error(f"Error restoring proxy for project {project_id}: {e}")
+    
+    def _close_stale_run(self, project_id):
+        """Record the end of a run that finished while the dashboard was not watching.
+        
+        The exit time is unknown, so the run is closed at the last time anything was
+        recorded for the project. The time the dashboard was down is not counted as uptime.
+        """
+        if self.projects[project_id]['status'] == 'running':
+            return
+        try:
+            last = self.events.last_event(project_id, START_EVENTS + END_EVENTS)
+            if last and last['event'] in START_EVENTS:
+                last_seen = self.events.last_event(project_id)['ts']
+                self.record_event(project_id, 'exited', ts=last_seen,
+                                  reason='Found stopped when the dashboard started, exit time unknown')
+        except Exception as e:
+            logger.error(f"Error checking events of project {project_id}: {e}")
+    
+    def record_event(self, project_id, event, **fields):
+        """Record a lifecycle event. Failures are logged and never break the caller."""
+        try:
+            self.events.record(project_id, event, **fields)
+        except Exception as e:
+            logger.error(f"Error recording {event} event for project {project_id}: {e}")
+    
     def save_config(self):
         """Save project configuration to YAML file."""
         try:
+            self.version += 1
             with open(self.CONFIG_FILE, 'w') as f:
                 yaml.dump({'projects': self.projects}, f)
             return True
@@ -55,7 +148,7 @@ class ProjectManager:
             logger.error(f"Error saving configuration: {e}")
             return False
     
-    def add_project(self, name, path, entry_file='main.py', port=5000):
+    def add_project(self, name, path, entry_file='main.py', port=5000, limits=None):
         """Add a new project to the manager."""
         with self.lock:
             try:
@@ -69,10 +162,16 @@ class ProjectManager:
                     'status': 'stopped',
                     'added_date': time.strftime('%Y-%m-%d %H:%M:%S')
                 }
-                return self.save_config()
+                if limits:
+                    self.projects[project_id]['limits'] = limits
+                saved = self.save_config()
             except Exception as e:
                 logger.error(f"Error adding project: {e}")
                 return False
+        
+        # Events are recorded after releasing the lock, so requests do not wait on the database
+        self.record_event(project_id, 'added', name=name, path=path, port=port)
+        return saved
     
     def remove_project(self, project_id):
         """Remove a project from the manager."""
@@ -99,8 +198,12 @@ class ProjectManager:
                     del self.logs[project_id]
                 if project_id in self.processes:
                     del self.processes[project_id]
-                return self.save_config()
-            return False
+                saved = self.save_config()
+            else:
+                return False
+        
+        self.record_event(project_id, 'removed')
+        return saved
     
     def start_project(self, project_id):
         """Start a Flask project."""
@@ -119,67 +222,170 @@ class ProjectManager:
                     return True
             
             try:
-                # Prepare the command
-                python_path = os.path.join(project['path'], 'venv', 'bin', 'python')
-                if not os.path.exists(python_path):
-                    python_path = 'python'  # Fallback to system python
-                
-                entry_file_path = os.path.join(project['path'], project['entry_file'])
-                
-                # Start the process
-                process = subprocess.Popen(
-                    [python_path, entry_file_path],
-                    cwd=project['path'],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
-                    universal_newlines=True
-                )
+                # A fresh start binds the public port directly, so drop any leftover proxy
+                self._close_proxy(project_id)
                 
-                self.processes[project_id] = process
                 self.logs[project_id] = []
+                process = self._spawn_process(project_id, project['port'])
+                self.processes[project_id] = process
+                self.started_at[project_id] = time.time()
                 
                 # Update project status
                 self.projects[project_id]['status'] = 'running'
                 self.projects[project_id]['pid'] = process.pid
                 self.save_config()
-                
-                # Start a thread to read process output
-                def read_output():
-                    if process and process.stdout:
-                        while process and process.poll() is None:
-                            try:
-                                line = process.stdout.readline()
-                                if line:
-                                    with self.lock:
-                                        self.logs[project_id].append(line.strip())
-                                        # Keep only the last 100 lines
-                                        if len(self.logs[project_id]) > 100:
-                                            self.logs[project_id] = self.logs[project_id][-100:]
-                            except Exception as e:
-                                logger.error(f"Error reading output: {e}")
-                                break
-                    
-                    # Process has terminated or there was an error
-                    with self.lock:
-                        if project_id in self.projects:
-                            self.projects[project_id]['status'] = 'stopped'
-                        if project_id in self.processes:
-                            del self.processes[project_id]
-                
-                import threading
-                output_thread = threading.Thread(target=read_output)
-                output_thread.daemon = True
-                output_thread.start()
-                
-                return True
+                port = project['port']
             
             except Exception as e:
                 logger.error(f"Error starting project {project_id}: {e}")
                 self.projects[project_id]['status'] = 'error'
                 self.save_config()
-                return False
+                error = str(e)
+                process = None
+        
+        # Events are recorded after releasing the lock, so requests do not wait on the database
+        if process is None:
+            self.record_event(project_id, 'start_failed', error=error)
+            return False
+        self.record_event(project_id, 'started', pid=process.pid, port=port)
+        self._watch_ready(project_id, process, port)
+        return True
+    
+    def _watch_ready(self, project_id, process, port):
+        """Record a 'ready' event with the start duration once a new process accepts connections."""
+        launched = time.time()
+        
+        def watch():
+            if self._wait_for_listener(process, int(port), self.READY_TIMEOUT):
+                self.record_event(project_id, 'ready', pid=process.pid, duration=time.time() - launched)
+        
+        ready_thread = threading.Thread(target=watch)
+        ready_thread.daemon = True
+        ready_thread.start()
+    
+    def _spawn_process(self, project_id, port):
+        """Launch a project's entry file on the given port. The caller must hold the lock.
+        
+        The port is passed to the app through the PORT environment variable. A reader
+        thread collects the output and marks the project stopped when the process exits,
+        unless another process has replaced it in the meantime.
+        """
+        project = self.projects[project_id]
+        
+        # Prepare the command
+        python_path = self._python_path(project)
+        entry_file_path = os.path.join(project['path'], project['entry_file'])
+        
+        env = os.environ.copy()
+        env['PORT'] = str(port)
+        
+        # Start the process
+        launched = time.time()
+        process = subprocess.Popen(
+            [python_path, entry_file_path],
+            cwd=project['path'],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            universal_newlines=True
+        )
+        
+        # Resource limits are applied right after the launch, before the app gets far
+        limits = project.get('limits') or {}
+        if limits:
+            cgroup_path = create_cgroup(project_id, process.pid, limits)
+            if cgroup_path:
+                self.cgroups[process.pid] = (project_id, cgroup_path)
+            try:
+                apply_limits(process.pid, limits, cgroup_path)
+            except OSError as e:
+                process.kill()
+                process.wait()
+                message = f"Could not apply resource limits: {e}"
+                self.logs.setdefault(project_id, []).append(message)
+                raise RuntimeError(message)
+        
+        # Start a thread to read process output
+        def read_output():
+            if process and process.stdout:
+                while process and process.poll() is None:
+                    try:
+                        line = process.stdout.readline()
+                        if line:
+                            with self.lock:
+                                logs = self.logs.setdefault(project_id, [])
+                                logs.append(line.strip())
+                                # Keep only the last 100 lines
+                                if len(logs) > 100:
+                                    self.logs[project_id] = logs[-100:]
+                    except Exception as e:
+                        logger.error(f"Error reading output: {e}")
+                        break
+            
+            # Process has terminated or there was an error
+            with self.lock:
+                exited_on_its_own = self.processes.get(project_id) is process
+                if exited_on_its_own:
+                    if project_id in self.projects:
+                        self.projects[project_id]['status'] = 'stopped'
+                    del self.processes[project_id]
+            
+            # Processes we stopped or replaced are recorded by the code that did it
+            if exited_on_its_own:
+                try:
+                    exit_code = process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    exit_code = None
+                self.record_event(project_id, 'exited' if exit_code == 0 else 'crashed',
+                                  pid=process.pid, exit_code=exit_code, duration=time.time() - launched)
+        
+        output_thread = threading.Thread(target=read_output)
+        output_thread.daemon = True
+        output_thread.start()
+        
+        return process
+    
+    def _python_path(self, project):
+        """Get the interpreter of a project, preferring its venv."""
+        python_path = os.path.join(project['path'], 'venv', 'bin', 'python')
+        if not os.path.exists(python_path):
+            python_path = 'python'  # Fallback to system python
+        return python_path
+    
+    def _terminate(self, process=None, pid=None):
+        """Stop a process gracefully, killing it if it does not exit in time."""
+        if process is not None:
+            # Try to terminate process gracefully first
+            process.terminate()
+            
+            # Wait for a bit to see if it terminates
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                # Force kill if it doesn't terminate
+                process.kill()
+        
+        # Also try to kill the process by PID in case the subprocess reference is stale
+        elif pid is not None:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                time.sleep(1)  # Give it a second to terminate
+                # Check if still running
+                if psutil.pid_exists(pid):
+                    os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                # Process already gone
+                pass
+    
+    def _close_proxy(self, project_id):
+        """Shut down the proxy in front of a project, if any. The caller must hold the lock."""
+        proxy = self.proxies.pop(project_id, None)
+        if proxy:
+            proxy.close()
+        if project_id in self.projects:
+            self.projects[project_id].pop('backend_port', None)
     
     def stop_project(self, project_id):
         """Stop a running Flask project."""
@@ -201,39 +407,23 @@ class ProjectManager:
                     
             if not is_running:
                 logger.info(f"Project {project_id} is not running")
+                self._close_proxy(project_id)
                 return True
             
             try:
+                stopping = time.time()
+                pid = self.projects[project_id].get('pid')
+                exit_code = None
+                
                 # Get the process
                 if project_id in self.processes:
-                    process = self.processes[project_id]
-                    pid = process.pid
-                    
-                    # Try to terminate process gracefully first
-                    process.terminate()
-                    
-                    # Wait for a bit to see if it terminates
-                    try:
-                        process.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        # Force kill if it doesn't terminate
-                        process.kill()
-                    
-                    # Remove from processes dict
-                    del self.processes[project_id]
+                    process = self.processes.pop(project_id)
+                    self._terminate(process=process)
+                    exit_code = process.returncode
+                elif pid is not None:
+                    self._terminate(pid=pid)
                 
-                # Also try to kill the process by PID in case the subprocess reference is stale
-                elif 'pid' in self.projects[project_id]:
-                    pid = self.projects[project_id]['pid']
-                    try:
-                        os.kill(pid, signal.SIGTERM)
-                        time.sleep(1)  # Give it a second to terminate
-                        # Check if still running
-                        if psutil.pid_exists(pid):
-                            os.kill(pid, signal.SIGKILL)
-                    except ProcessLookupError:
-                        # Process already gone
-                        pass
+                self._close_proxy(project_id)
                 
                 # Update project status
                 self.projects[project_id]['status'] = 'stopped'
@@ -241,11 +431,460 @@ class ProjectManager:
                     del self.projects[project_id]['pid']
                 self.save_config()
                 
-                return True
+                started_at = self.started_at.pop(project_id, None)
             
             except Exception as e:
                 logger.error(f"Error stopping project {project_id}: {e}")
                 return False
+        
+        self.record_event(project_id, 'stopped', pid=pid, exit_code=exit_code,
+                          duration=time.time() - stopping,
+                          uptime=time.time() - started_at if started_at else None)
+        return True
+    
+    def rolling_restart(self, project_id, ready_timeout=30, drain_timeout=10):
+        """Restart a running project without taking its port offline.
+        
+        The new instance is started on a standby port and must accept connections
+        before traffic is moved to it. Projects already behind the built-in proxy are
+        switched over and the old instance is drained before it is stopped. Otherwise
+        the old instance is stopped and the proxy takes over its port, which leaves a
+        short gap. The public port is probed throughout and the result reports the
+        longest outage. Dropped connections are only counted when the proxy was
+        already in front, and are None otherwise.
+        """
+        with self.lock:
+            if project_id not in self.projects:
+                return {'success': False, 'message': 'Project not found'}
+            if project_id in self.restarting:
+                return {'success': False, 'message': 'A restart is already in progress'}
+            if self._current_status(project_id) != 'running':
+                return {'success': False, 'message': 'Project is not running'}
+            
+            project = self.projects[project_id]
+            public_port = int(project['port'])
+            old_process = self.processes.get(project_id)
+            old_pid = project.get('pid')
+            proxy = self.proxies.get(project_id)
+            old_backend_port = proxy.backend_port if proxy else public_port
+            # Without a proxy yet there is nothing to count connections refused during the handoff
+            dropped_before = proxy.dropped if proxy else None
+            standby_port = find_free_port()
+            
+            self.restarting.add(project_id)
+            started = time.time()
+            probe = AvailabilityProbe(public_port)
+            probe.start()
+            
+            try:
+                new_process = self._spawn_process(project_id, standby_port)
+            except Exception as e:
+                self.restarting.discard(project_id)
+                logger.error(f"Error starting standby instance for {project_id}: {e}")
+                new_process = None
+                error = str(e)
+        
+        if new_process is None:
+            probe.stop()
+            self.record_event(project_id, 'restart_failed', error=error)
+            return {'success': False, 'message': f'Error starting new instance: {error}'}
+        
+        try:
+            if not self._wait_for_listener(new_process, standby_port, ready_timeout):
+                self._terminate(process=new_process)
+                self.record_event(project_id, 'restart_failed', pid=new_process.pid,
+                                  exit_code=new_process.returncode, error='New instance never became ready')
+                return {
+                    'success': False,
+                    'message': f'New instance did not accept connections on port {standby_port} '
+                               f'within {ready_timeout}s; the old instance was left running'
+                }
+            
+            self.record_event(project_id, 'ready', pid=new_process.pid, duration=time.time() - started,
+                              backend_port=standby_port)
+            
+            drained = True
+            handoff_window = 0.0
+            if proxy:
+                # Zero-downtime path: switch the proxy, then drain the old instance
+                proxy.switch_backend(standby_port)
+                self._register_process(project_id, new_process, standby_port)
+                drained = proxy.wait_for_drain(old_backend_port, timeout=drain_timeout)
+                self._terminate(process=old_process, pid=old_pid)
+            else:
+                # First handoff: the old instance owns the public port, so it has to go first
+                self._register_process(project_id, new_process, standby_port)
+                handoff_started = time.time()
+                self._terminate(process=old_process, pid=old_pid)
+                try:
+                    proxy = PortProxy(public_port, standby_port)
+                except OSError as e:
+                    return self._roll_back_handoff(project_id, new_process, old_pid, public_port,
+                                                   handoff_started, probe, ready_timeout, e)
+                handoff_window = time.time() - handoff_started
+                with self.lock:
+                    self.proxies[project_id] = proxy
+            
+            measurements = probe.stop()
+            result = {
+                'success': True,
+                'message': 'Project restarted successfully',
+                'old_pid': old_pid,
+                'new_pid': new_process.pid,
+                'backend_port': standby_port,
+                'drained': drained,
+                'dropped_requests': proxy.dropped - dropped_before if dropped_before is not None else None,
+                # The probe can miss a short gap, so never report less than the handoff took
+                'downtime_ms': max(measurements['downtime_ms'], round(handoff_window * 1000, 1)),
+                'probes': measurements['probes'],
+                'failed_probes': measurements['failed_probes'],
+                'duration_ms': round((time.time() - started) * 1000, 1),
+                'finished': time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+            
+            with self.lock:
+                if project_id in self.projects:
+                    self.projects[project_id]['last_rolling_restart'] = {
+                        key: value for key, value in result.items() if key not in ('success', 'message')
+                    }
+                    self.save_config()
+            
+            self.record_event(project_id, 'restarted', pid=new_process.pid, duration=result['duration_ms'] / 1000,
+                              old_pid=old_pid, downtime_ms=result['downtime_ms'],
+                              dropped_requests=result['dropped_requests'])
+            return result
+        
+        except Exception as e:
+            logger.error(f"Error during rolling restart of {project_id}: {e}")
+            return {'success': False, 'message': f'Error: {str(e)}'}
+        
+        finally:
+            probe.stop()
+            with self.lock:
+                self.restarting.discard(project_id)
+    
+    def start_rolling_restart(self, project_id):
+        """Run a rolling restart in a background thread. Poll get_rolling_restart for the result.
+        
+        Waiting for the standby instance and draining the old one can take longer
+        than a web worker may spend on a request.
+        """
+        with self.lock:
+            if project_id not in self.projects:
+                return {'success': False, 'message': 'Project not found'}
+            if project_id in self.restarting or (project_id in self.restart_results
+                                                 and self.restart_results[project_id] is None):
+                return {'success': False, 'message': 'A restart is already in progress'}
+            if self._current_status(project_id) != 'running':
+                return {'success': False, 'message': 'Project is not running'}
+            self.restart_results[project_id] = None
+        
+        restart_thread = threading.Thread(target=self._run_rolling_restart, args=(project_id,))
+        restart_thread.daemon = True
+        restart_thread.start()
+        return {'success': True, 'message': 'Rolling restart started', 'in_progress': True}
+    
+    def get_rolling_restart(self, project_id):
+        """Get whether a background rolling restart is running and the result of the last one."""
+        with self.lock:
+            if project_id not in self.projects:
+                return {'success': False, 'message': 'Project not found'}
+            result = self.restart_results.get(project_id)
+            return {
+                'success': True,
+                'in_progress': project_id in self.restart_results and result is None,
+                'result': result
+            }
+    
+    def _run_rolling_restart(self, project_id):
+        try:
+            result = self.rolling_restart(project_id)
+        except Exception as e:
+            logger.error(f"Error during rolling restart of {project_id}: {e}")
+            result = {'success': False, 'message': f'Error: {str(e)}'}
+        with self.lock:
+            self.restart_results[project_id] = result
+    
+    def _roll_back_handoff(self, project_id, standby_process, old_pid, public_port, outage_started,
+                           probe, ready_timeout, error):
+        """Put a project back on its public port after the proxy could not take it over.
+        
+        The old instance is already gone at this point, so nothing serves the public
+        port until a fresh instance is started on it. The outage is recorded.
+        """
+        logger.error(f"Proxy could not bind port {public_port} for {project_id}, "
+                     f"starting a fresh instance on it: {error}")
+        self.record_event(project_id, 'stopped', pid=old_pid, ts=outage_started,
+                          reason='Rolling restart handoff failed')
+        
+        with self.lock:
+            fresh_process = None
+            try:
+                if project_id in self.projects:
+                    fresh_process = self._spawn_process(project_id, public_port)
+            except Exception as e:
+                logger.error(f"Error starting project {project_id} on port {public_port}: {e}")
+            
+            # Replace the standby before stopping it so its exit is not taken for a crash
+            if fresh_process is not None:
+                self.processes[project_id] = fresh_process
+                self.started_at[project_id] = time.time()
+                self.projects[project_id]['pid'] = fresh_process.pid
+            else:
+                self.processes.pop(project_id, None)
+                self.started_at.pop(project_id, None)
+                if project_id in self.projects:
+                    self.projects[project_id]['status'] = 'error'
+                    self.projects[project_id].pop('pid', None)
+            if project_id in self.projects:
+                self.projects[project_id].pop('backend_port', None)
+                self.save_config()
+        
+        self._terminate(process=standby_process)
+        
+        ready = False
+        if fresh_process is not None:
+            self.record_event(project_id, 'started', pid=fresh_process.pid, port=public_port)
+            ready = self._wait_for_listener(fresh_process, public_port, ready_timeout)
+            if ready:
+                # No duration, this start was not timed from its own launch and would skew the start percentiles
+                self.record_event(project_id, 'ready', pid=fresh_process.pid)
+        
+        measurements = probe.stop()
+        downtime_ms = max(measurements['downtime_ms'], round((time.time() - outage_started) * 1000, 1))
+        self.record_event(project_id, 'restart_failed', pid=fresh_process.pid if fresh_process else None,
+                          error=f'Proxy could not bind port {public_port}: {error}',
+                          downtime_ms=downtime_ms if ready else None)
+        
+        if ready:
+            message = (f'Proxy could not take over port {public_port} ({error}); the project was '
+                       f'restarted on it directly after {downtime_ms:.0f} ms of downtime')
+        else:
+            message = (f'Proxy could not take over port {public_port} ({error}) and the project '
+                       f'could not be started on it again; it is down')
+        return {'success': False, 'message': message, 'downtime_ms': downtime_ms if ready else None}
+    
+    def _wait_for_listener(self, process, port, timeout):
+        """Wait until a process we started listens on a port.
+        
+        Connecting to the port is not enough, since whatever held it before, such as an
+        orphaned instance, may still accept connections. Gives up if the process exits.
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline and process.poll() is None:
+            if self._listens_on(process.pid, port):
+                return True
+            time.sleep(0.1)
+        return False
+    
+    def _listens_on(self, pid, port):
+        """Check whether a process or one of its children listens on a port."""
+        try:
+            process = psutil.Process(pid)
+            for candidate in [process] + process.children(recursive=True):
+                for connection in candidate.net_connections(kind='tcp'):
+                    if connection.status == psutil.CONN_LISTEN and connection.laddr.port == port:
+                        return True
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+        return False
+    
+    def _register_process(self, project_id, process, backend_port):
+        """Make a newly started instance the tracked process of a project."""
+        with self.lock:
+            self.processes[project_id] = process
+            self.started_at.setdefault(project_id, time.time())
+            if project_id in self.projects:
+                self.projects[project_id]['status'] = 'running'
+                self.projects[project_id]['pid'] = process.pid
+                self.projects[project_id]['backend_port'] = backend_port
+                self.save_config()
+    
+    def set_project_limits(self, project_id, data):
+        """Update the resource limits of a project. They apply from the next start."""
+        try:
+            limits = parse_limits(data)
+        except ValueError as e:
+            return {'success': False, 'message': str(e)}
+        
+        with self.lock:
+            if project_id not in self.projects:
+                return {'success': False, 'message': 'Project not found'}
+            if limits:
+                self.projects[project_id]['limits'] = limits
+            else:
+                self.projects[project_id].pop('limits', None)
+            self.save_config()
+        
+        return {'success': True, 'message': 'Resource limits saved, they apply from the next start', 'limits': limits}
+    
+    def get_project_limits(self, project_id):
+        """Get the resource limits, recent violations and current usage of a project."""
+        with self.lock:
+            if project_id not in self.projects:
+                return {'success': False, 'message': 'Project not found'}
+            project = self.projects[project_id]
+            rss_mb = None
+            if self._current_status(project_id) == 'running' and 'pid' in project:
+                rss_mb = get_rss_mb(project['pid'])
+            return {
+                'success': True,
+                'limits': project.get('limits', {}),
+                'violations': project.get('violations', []),
+                'rss_mb': round(rss_mb, 1) if rss_mb is not None else None,
+                'cgroup': project.get('pid') in self.cgroups
+            }
+    
+    def check_resource_limits(self):
+        """Check projects against their limits, record violations and enforce the configured action."""
+        actions = []
+        violations_found = []
+        recovered = []
+        with self.lock:
+            # The kernel enforces cgroup memory limits by OOM-killing the app
+            oom_messages = {}
+            for pid, (project_id, cgroup_path) in list(self.cgroups.items()):
+                oom_kills = read_oom_kills(cgroup_path)
+                if oom_kills > self.oom_kills.get(cgroup_path, 0):
+                    limits = (self.projects.get(project_id) or {}).get('limits') or {}
+                    oom_messages[project_id] = (f"Killed for exceeding the memory limit of "
+                                                f"{limits.get('memory_limit_mb')} MB")
+                self.oom_kills[cgroup_path] = oom_kills
+                # Clean up the groups of instances that are gone
+                if cgroup_is_empty(cgroup_path) and remove_cgroup(cgroup_path):
+                    del self.cgroups[pid]
+                    self.oom_kills.pop(cgroup_path, None)
+            
+            for project_id, project in self.projects.items():
+                limits = project.get('limits') or {}
+                messages = []
+                if project_id in oom_messages:
+                    messages.append(oom_messages[project_id])
+                
+                over_pid = None
+                if ('rss_limit_mb' in limits and project_id not in self.restarting
+                        and self._current_status(project_id) == 'running' and 'pid' in project):
+                    rss_mb = get_rss_mb(project['pid'])
+                    if rss_mb is not None and rss_mb > limits['rss_limit_mb']:
+                        over_pid = project['pid']
+                        # Only going over the budget is a violation, not every check that finds it still over
+                        if self.over_budget.get(project_id) != over_pid:
+                            messages.append(f"RSS of {rss_mb:.0f} MB exceeds the budget of {limits['rss_limit_mb']} MB")
+                        if limits.get('on_violation', 'flag') != 'flag':
+                            actions.append((project_id, limits['on_violation']))
+                    elif rss_mb is not None and self.over_budget.get(project_id) == project['pid']:
+                        recovered.append((project_id, project['pid'],
+                                          f"RSS of {rss_mb:.0f} MB is back within the budget of {limits['rss_limit_mb']} MB"))
+                if over_pid is not None:
+                    self.over_budget[project_id] = over_pid
+                else:
+                    self.over_budget.pop(project_id, None)
+                
+                for message in messages:
+                    logger.warning(f"Project {project_id}: {message}")
+                    violations_found.append((project_id, project.get('pid'), message))
+                    violations = project.setdefault('violations', [])
+                    violations.append({'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'message': message})
+                    del violations[:-self.MAX_VIOLATIONS]
+                if messages:
+                    self.save_config()
+        
+        for project_id, pid, message in violations_found:
+            self.record_event(project_id, 'resource_violation', pid=pid, message=message)
+        for project_id, pid, message in recovered:
+            logger.info(f"Project {project_id}: {message}")
+            self.record_event(project_id, 'resource_recovered', pid=pid, message=message)
+        
+        # Stopping and starting take the lock themselves
+        for project_id, action in actions:
+            if action == 'restart' and not self._allow_limit_restart(project_id):
+                action = 'stop'
+            logger.warning(f"Project {project_id}: enforcing resource limits ({action})")
+            self.stop_project(project_id)
+            if action == 'restart':
+                self.start_project(project_id)
+    
+    def _allow_limit_restart(self, project_id):
+        """Count a restart for going over the RSS budget, or escalate to a stop once the budget is used up."""
+        now = time.time()
+        with self.lock:
+            restarts = [restart for restart in self.limit_restarts.get(project_id, [])
+                        if now - restart < self.LIMIT_RESTART_WINDOW]
+            if len(restarts) < self.MAX_LIMIT_RESTARTS:
+                restarts.append(now)
+                self.limit_restarts[project_id] = restarts
+                return True
+            
+            self.limit_restarts.pop(project_id, None)
+            message = (f"Restarted {len(restarts)} times in {self.LIMIT_RESTART_WINDOW // 60} minutes "
+                       f"for exceeding the RSS budget, stopping instead")
+            if project_id in self.projects:
+                violations = self.projects[project_id].setdefault('violations', [])
+                violations.append({'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'message': message})
+                del violations[:-self.MAX_VIOLATIONS]
+                self.save_config()
+        
+        logger.warning(f"Project {project_id}: {message}")
+        self.record_event(project_id, 'limit_escalated', message=message, restarts=len(restarts))
+        return False
+    
+    def _watchdog(self):
+        while True:
+            time.sleep(self.WATCHDOG_INTERVAL)
+            try:
+                self.check_resource_limits()
+            except Exception as e:
+                logger.error(f"Error checking resource limits: {e}")
+    
+    def warm_up(self, project_id):
+        """Precompile a project and check its imports in a separate interpreter.
+        
+        The result is kept on the project so the details page can show the
+        slowest imports and any import errors. This is not a sandbox: the imports
+        run the project's module-level code with the dashboard's environment.
+        """
+        with self.lock:
+            if project_id not in self.projects:
+                return {'success': False, 'message': 'Project not found'}
+            if project_id in self.warming:
+                return {'success': False, 'message': 'A warm-up is already in progress'}
+            project = self.projects[project_id].copy()
+            self.warming.add(project_id)
+        
+        try:
+            # Keep anything the imports start off the project's real port
+            env = os.environ.copy()
+            env['PORT'] = str(find_free_port())
+            result = run_warmup(self._python_path(project), project['path'], project['entry_file'], env=env)
+        finally:
+            with self.lock:
+                self.warming.discard(project_id)
+        
+        with self.lock:
+            if project_id in self.projects:
+                self.projects[project_id]['warmup'] = result
+                self.save_config()
+        
+        self.record_event(project_id, 'warmup', duration=result['duration_ms'] / 1000, success=result['success'],
+                          import_errors=len(result['import_errors']))
+        
+        result = dict(result)
+        result['message'] = 'Warm-up completed successfully' if result['success'] else 'Warm-up found problems'
+        return result
+    
+    def _warmup_scheduler(self):
+        while True:
+            time.sleep(60)
+            with self.lock:
+                due = [
+                    project_id for project_id, project in self.projects.items()
+                    if time.time() - (project.get('warmup') or {}).get('finished_at', 0) >= self.WARMUP_INTERVAL
+                ]
+            for project_id in due:
+                try:
+                    self.warm_up(project_id)
+                except Exception as e:
+                    logger.error(f"Error warming up project {project_id}: {e}")
     
     def get_project(self, project_id):
         """Get a project by ID."""
@@ -283,25 +922,88 @@ class ProjectManager:
                 project_copy = project.copy()
                 
                 # Directly update status to avoid calling update_status which could cause deadlocks
-                if project_id in self.processes:
-                    process = self.processes[project_id]
-                    if process.poll() is None:
-                        project_copy['status'] = 'running'
-                    else:
-                        project_copy['status'] = 'stopped'
-                elif 'pid' in project:
-                    pid = project['pid']
-                    if psutil.pid_exists(pid):
-                        project_copy['status'] = 'running'
-                    else:
-                        project_copy['status'] = 'stopped'
-                else:
-                    project_copy['status'] = 'stopped'
+                project_copy['status'] = self._current_status(project_id)
                 
                 projects.append(project_copy)
                 
             return projects
     
+    def query_projects(self, status=None, search=None, sort='name', order='asc',
+                       page=1, per_page=None, fields=None):
+        """Get a filtered, sorted and paginated slice of the projects.
+        
+        Returns a dict with the matching projects and the pagination details.
+        Only the requested fields are copied when a field list is given.
+        """
+        if sort not in self.SORT_FIELDS:
+            raise ValueError(f"Cannot sort by '{sort}'")
+        
+        with self.lock:
+            matches = []
+            for project_id, project in self.projects.items():
+                current_status = self._current_status(project_id)
+                if status and current_status != status:
+                    continue
+                if search and search.lower() not in str(project.get('name', '')).lower():
+                    continue
+                matches.append((project_id, project, current_status))
+            
+            def sort_key(item):
+                value = item[2] if sort == 'status' else item[1].get(sort)
+                if sort == 'port':
+                    return int(value or 0)
+                return str(value or '').lower()
+            
+            matches.sort(key=sort_key, reverse=(order == 'desc'))
+            
+            total = len(matches)
+            if per_page:
+                page = max(1, page)
+                matches = matches[(page - 1) * per_page:page * per_page]
+            else:
+                page = 1
+            
+            projects = []
+            for project_id, project, current_status in matches:
+                if fields:
+                    # Always keep the ID so clients can match the partial records
+                    project_copy = {'id': project_id}
+                    project_copy.update({field: project[field] for field in fields if field in project})
+                    if 'status' in fields:
+                        project_copy['status'] = current_status
+                else:
+                    project_copy = project.copy()
+                    project_copy['status'] = current_status
+                projects.append(project_copy)
+        
+        return {
+            'projects': projects,
+            'total': total,
+            'page': page,
+            'per_page': per_page or total,
+            'pages': (total + per_page - 1) // per_page if per_page else 1
+        }
+    
+    def get_projects_etag(self):
+        """Get a fingerprint of the project list that changes whenever it would render differently."""
+        with self.lock:
+            digest = hashlib.sha1(str(self.version).encode())
+            for project_id in self.projects:
+                digest.update(f"{project_id}:{self._current_status(project_id)};".encode())
+            return digest.hexdigest()
+    
+    def _current_status(self, project_id):
+        """Get the live status of a project. The caller must hold the lock."""
+        if project_id in self.processes:
+            process = self.processes[project_id]
+            if process.poll() is None:
+                return 'running'
+            return 'stopped'
+        elif 'pid' in self.projects[project_id]:
+            if psutil.pid_exists(self.projects[project_id]['pid']):
+                return 'running'
+        return 'stopped'
+    
     def get_project_logs(self, project_id):
         """Get the logs for a project."""
         with self.lock:
@@ -412,23 +1114,44 @@ class ProjectManager:
             return {'success': False, 'message': f'Error reading file: {str(e)}'}
     
     def check_dependencies(self, project_id):
-        """Check and return the dependencies of a project."""
+        """Check the declared dependencies of a project against what its interpreter has installed."""
         if project_id not in self.projects:
             return {'found': False, 'message': 'Project not found'}
         
         project = self.projects[project_id]
-        path = project['path']
-        
-        # Check for requirements.txt
-        req_file = os.path.join(path, 'requirements.txt')
-        if not os.path.exists(req_file):
-            return {'found': False, 'message': 'No requirements.txt found'}
+        return self.dependency_analyzer.analyze(project['path'], self._python_path(project))
+    
+    def check_all_dependencies(self):
+        """Check the dependencies of every project and summarize the problems across the fleet."""
+        with self.lock:
+            projects = [project.copy() for project in self.projects.values()]
         
-        # Read requirements
-        with open(req_file, 'r') as f:
-            requirements = [line.strip() for line in f.readlines() if line.strip() and not line.startswith('#')]
+        results = []
+        totals = {'projects': len(projects), 'install_needed': 0, 'missing': 0, 'outdated': 0, 'conflicting': 0}
+        for project in projects:
+            try:
+                analysis = self.dependency_analyzer.analyze(project['path'], self._python_path(project))
+            except Exception as e:
+                logger.error(f"Error checking dependencies for project {project['id']}: {e}")
+                analysis = {'found': False, 'message': str(e)}
+            
+            entry = {
+                'id': project['id'],
+                'name': project['name'],
+                'found': analysis['found'],
+                'message': analysis.get('message')
+            }
+            if analysis['found']:
+                entry['files'] = analysis['files']
+                entry['summary'] = analysis['summary']
+                entry['install_needed'] = analysis['install_needed']
+                entry['problems'] = [package for package in analysis['packages'] if package['status'] != 'ok']
+                totals['install_needed'] += int(analysis['install_needed'])
+                for status in ('missing', 'outdated', 'conflicting'):
+                    totals[status] += analysis['summary'][status]
+            results.append(entry)
         
-        return {'found': True, 'requirements': requirements}
+        return {'success': True, 'projects': results, 'totals': totals}
     
     def install_dependencies(self, project_id):
         """Install dependencies for a project."""
@@ -439,6 +1162,10 @@ class ProjectManager:
         if not deps['found']:
             return {'success': False, 'message': deps['message']}
         
+        # Skip pip entirely when everything is already installed
+        if not deps['install_needed']:
+            return {'success': True, 'message': 'All dependencies are already installed', 'output': []}
+        
         project = self.projects[project_id]
         path = project['path']
         
@@ -453,31 +1180,45 @@ class ProjectManager:
             # Use system pip
             pip_path = 'pip'
         
+        # Install what the analysis found missing or outdated. requirements.txt still goes
+        # through pip as a whole, since it may use hashes, includes or lines we cannot analyze.
+        needed = [package for package in deps['packages'] if package['status'] in ('missing', 'outdated')]
+        commands = []
+        requirements_file = os.path.join(path, 'requirements.txt')
+        if os.path.exists(requirements_file) and ('requirements.txt' in deps['unparsed'] or any(
+                requirement['source'] == 'requirements.txt'
+                for package in needed for requirement in package['required'])):
+            commands.append([pip_path, 'install', '-r', requirements_file])
+        extra_specs = [self._install_spec(package) for package in needed if not any(
+            requirement['source'] == 'requirements.txt' for requirement in package['required'])]
+        if extra_specs:
+            commands.append([pip_path, 'install'] + extra_specs)
+        if not commands:
+            return {'success': False, 'message': 'Cannot install the unparsed dependencies: '
+                    + ', '.join(deps['unparsed']), 'output': []}
+        
         try:
             # Install requirements
-            process = subprocess.Popen(
-                [pip_path, 'install', '-r', os.path.join(path, 'requirements.txt')],
-                cwd=path,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1
-            )
-            
-            # Capture output
+            installing = time.time()
             output = []
-            if process.stdout:
-                for line in iter(process.stdout.readline, ''):
-                    output.append(line.strip())
-                    if process.poll() is not None:
-                        break
+            returncode = 0
+            for command in commands:
+                returncode = self._run_pip(command, path, output)
+                if returncode != 0:
+                    break
             
-            # Get remaining output
-            remaining_output, _ = process.communicate()
-            if remaining_output:
-                output.extend(remaining_output.splitlines())
+            self.dependency_analyzer.invalidate(path)
+            self.record_event(project_id, 'dependencies_installed', exit_code=returncode,
+                              duration=time.time() - installing)
             
-            if process.returncode == 0:
+            if returncode == 0:
+                remaining = self.check_dependencies(project_id)
+                still_needed = [package['name'] for package in remaining.get('packages', [])
+                                if package['status'] in ('missing', 'outdated')]
+                if still_needed:
+                    return {'success': False, 'output': output,
+                            'message': 'pip finished but some dependencies are still not satisfied: '
+                                       + ', '.join(still_needed)}
                 return {'success': True, 'message': 'Dependencies installed successfully', 'output': output}
             else:
                 return {'success': False, 'message': 'Error installing dependencies', 'output': output}
@@ -486,6 +1227,37 @@ class ProjectManager:
             logger.error(f"Error installing dependencies: {e}")
             return {'success': False, 'message': f'Error: {str(e)}'}
     
+    def _install_spec(self, package):
+        """Build the pip argument that installs a package the analysis found missing or outdated."""
+        if package['locked']:
+            return f"{package['name']}=={package['locked']}"
+        specifiers = [requirement['specifier'] for requirement in package['required'] if requirement['specifier']]
+        return package['name'] + ','.join(specifiers)
+    
+    def _run_pip(self, command, path, output):
+        """Run a pip command, append its output and return its exit code."""
+        process = subprocess.Popen(
+            command,
+            cwd=path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1
+        )
+        
+        # Capture output
+        if process.stdout:
+            for line in iter(process.stdout.readline, ''):
+                output.append(line.strip())
+                if process.poll() is not None:
+                    break
+        
+        # Get remaining output
+        remaining_output, _ = process.communicate()
+        if remaining_output:
+            output.extend(remaining_output.splitlines())
+        return process.returncode
+    
     def update_status(self, project_id):
         """Update the status of a project based on its process."""
         if project_id not in self.projects:
@@ -0,0 +1,223 @@
+import os
+import logging
+import resource
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Root of the unified (v2) cgroup hierarchy and the group our projects are placed under
+CGROUP_ROOT = '/sys/fs/cgroup'
+CGROUP_PARENT = 'flask_dashboard'
+
+# What to do when a running project goes over its RSS budget
+VIOLATION_ACTIONS = ('flag', 'restart', 'stop')
+
+
+def parse_limits(data):
+    """Validate resource limit settings and return them in normalized form.
+
+    Empty values are dropped. Raises ValueError for invalid settings.
+    """
+    limits = {}
+    data = data or {}
+
+    cpu_affinity = data.get('cpu_affinity')
+    if cpu_affinity not in (None, '', []):
+        if isinstance(cpu_affinity, str):
+            cpu_affinity = _parse_cpu_list(cpu_affinity)
+        try:
+            cpu_affinity = sorted({int(cpu) for cpu in cpu_affinity})
+        except (TypeError, ValueError):
+            raise ValueError('CPU affinity must be a list of core numbers')
+        if not cpu_affinity:
+            raise ValueError('CPU affinity must name at least one core')
+        cpu_count = os.cpu_count() or 1
+        for cpu in cpu_affinity:
+            if cpu < 0 or cpu >= cpu_count:
+                raise ValueError(f'CPU core {cpu} does not exist (this host has {cpu_count})')
+        limits['cpu_affinity'] = cpu_affinity
+
+    nice = data.get('nice')
+    if nice not in (None, ''):
+        try:
+            nice = int(nice)
+        except (TypeError, ValueError):
+            raise ValueError('Nice level must be a number')
+        if nice < -20 or nice > 19:
+            raise ValueError('Nice level must be between -20 and 19')
+        lowest = min_nice()
+        if nice < lowest:
+            raise ValueError(f'The dashboard is not allowed to set a nice level below {lowest}')
+        limits['nice'] = nice
+
+    for field, label in (('memory_limit_mb', 'Memory limit'),
+                         ('rss_limit_mb', 'RSS budget'),
+                         ('max_open_files', 'Max open files')):
+        value = data.get(field)
+        if value in (None, ''):
+            continue
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{label} must be a number')
+        if value <= 0:
+            raise ValueError(f'{label} must be greater than zero')
+        limits[field] = value
+
+    on_violation = data.get('on_violation') or 'flag'
+    if on_violation not in VIOLATION_ACTIONS:
+        raise ValueError(f"On violation must be one of: {', '.join(VIOLATION_ACTIONS)}")
+    if 'rss_limit_mb' in limits:
+        limits['on_violation'] = on_violation
+
+    return limits
+
+
+def _parse_cpu_list(text):
+    """Parse a CPU list such as '0,2-3' into core numbers."""
+    cpus = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            try:
+                start, end = (int(value) for value in part.split('-', 1))
+            except ValueError:
+                raise ValueError(f"Invalid CPU range '{part}'")
+            if start > end:
+                raise ValueError(f"Invalid CPU range '{part}', the start is after the end")
+            cpus.extend(range(start, end + 1))
+        else:
+            cpus.append(part)
+    return cpus
+
+
+def cgroup_v2_available():
+    """Check whether we can create cgroup v2 groups with a memory controller."""
+    controllers = os.path.join(CGROUP_ROOT, 'cgroup.controllers')
+    try:
+        with open(controllers) as f:
+            if 'memory' not in f.read().split():
+                return False
+    except OSError:
+        return False
+    return os.access(CGROUP_ROOT, os.W_OK)
+
+
+def min_nice():
+    """Get the lowest nice level the dashboard may give the projects it starts."""
+    if os.geteuid() == 0:
+        return -20
+    # Unprivileged processes may only go below their own level as far as RLIMIT_NICE allows
+    current = os.getpriority(os.PRIO_PROCESS, 0)
+    soft, _ = resource.getrlimit(resource.RLIMIT_NICE)
+    if soft == resource.RLIM_INFINITY:
+        return -20
+    return max(-20, min(current, 20 - soft))
+
+
+def create_cgroup(project_id, pid, limits):
+    """Create a cgroup for one instance of a project, set its memory limit and move the process in.
+
+    Each instance gets its own group so a standby instance started by a rolling
+    restart does not share the memory limit of the instance it replaces. Returns
+    the cgroup path, or None when cgroups are not available or the project has
+    no memory limit.
+    """
+    if 'memory_limit_mb' not in limits or not cgroup_v2_available():
+        return None
+
+    parent = os.path.join(CGROUP_ROOT, CGROUP_PARENT)
+    path = os.path.join(parent, f'{project_id}-{pid}')
+    try:
+        if not os.path.isdir(parent):
+            os.mkdir(parent)
+            # Let child groups use the memory controller
+            with open(os.path.join(parent, 'cgroup.subtree_control'), 'w') as f:
+                f.write('+memory')
+        if not os.path.isdir(path):
+            os.mkdir(path)
+        with open(os.path.join(path, 'memory.max'), 'w') as f:
+            f.write(str(limits['memory_limit_mb'] * 1024 * 1024))
+        with open(os.path.join(path, 'cgroup.procs'), 'w') as f:
+            f.write(str(pid))
+        return path
+    except OSError as e:
+        logger.warning(f"Could not set up cgroup for project {project_id}, falling back to rlimit: {e}")
+        remove_cgroup(path)
+        return None
+
+
+def cgroup_is_empty(cgroup_path):
+    """Check whether no process is left in a cgroup."""
+    try:
+        with open(os.path.join(cgroup_path, 'cgroup.procs')) as f:
+            return not f.read().strip()
+    except OSError:
+        return True
+
+
+def remove_cgroup(cgroup_path):
+    """Remove an empty cgroup. Returns whether it is gone."""
+    try:
+        os.rmdir(cgroup_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove cgroup {cgroup_path}: {e}")
+        return False
+    return True
+
+
+def apply_limits(pid, limits, cgroup_path=None):
+    """Apply the limits to a process that has just been started.
+
+    They are applied from the dashboard instead of a preexec_fn in the child,
+    which is not safe while the dashboard runs its watchdog, proxy and reader
+    threads. Raises OSError when a limit cannot be applied.
+    """
+    if 'memory_limit_mb' in limits and not cgroup_path:
+        memory = limits['memory_limit_mb'] * 1024 * 1024
+        resource.prlimit(pid, resource.RLIMIT_AS, (memory, memory))
+
+    if 'max_open_files' in limits:
+        _, hard = resource.prlimit(pid, resource.RLIMIT_NOFILE)
+        files = limits['max_open_files']
+        if hard != resource.RLIM_INFINITY:
+            files = min(files, hard)
+        resource.prlimit(pid, resource.RLIMIT_NOFILE, (files, files))
+
+    if 'cpu_affinity' in limits:
+        os.sched_setaffinity(pid, limits['cpu_affinity'])
+
+    if 'nice' in limits:
+        os.setpriority(os.PRIO_PROCESS, pid, limits['nice'])
+
+
+def read_oom_kills(cgroup_path):
+    """Get how many times the kernel OOM killer fired inside a cgroup."""
+    try:
+        with open(os.path.join(cgroup_path, 'memory.events')) as f:
+            for line in f:
+                key, _, value = line.partition(' ')
+                if key == 'oom_kill':
+                    return int(value)
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def get_rss_mb(pid):
+    """Get the resident memory of a process and its children in MB."""
+    try:
+        process = psutil.Process(pid)
+        rss = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return rss / (1024 * 1024)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
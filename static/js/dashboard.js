@@ -39,21 +39,44 @@ document.addEventListener('DOMContentLoaded', function() {
             startProject(event.target.dataset.projectId);
         } else if (event.target.classList.contains('btn-stop-project')) {
             stopProject(event.target.dataset.projectId);
+        } else if (event.target.classList.contains('btn-rolling-restart-project')) {
+            rollingRestartProject(event.target.dataset.projectId);
         } else if (event.target.classList.contains('btn-remove-project')) {
             removeProject(event.target.dataset.projectId);
         }
     });
 });
 
+// ETag of the last project list we received, so unchanged polls come back as 304
+let projectStatusesEtag = null;
+
 function refreshProjectStatuses() {
-    fetch('/api/projects')
+    const headers = {};
+    if (projectStatusesEtag) {
+        headers['If-None-Match'] = projectStatusesEtag;
+    }
+    
+    // Only the ID and status are needed to refresh the cards. The dashboard polls the
+    // same filtered page it rendered, other pages poll the whole list.
+    const projectList = document.getElementById('project-list');
+    const statusUrl = projectList ? projectList.dataset.statusUrl : '/api/projects?fields=id,status';
+    fetch(statusUrl, { headers: headers })
         .then(response => {
+            if (response.status === 304) {
+                return null;
+            }
             if (!response.ok) {
                 throw new Error(`HTTP error! Status: ${response.status}`);
             }
+            projectStatusesEtag = response.headers.get('ETag');
             return response.json();
         })
         .then(data => {
+            if (!data) {
+                // Nothing changed since the last poll
+                return;
+            }
+            
             // Handle both array and object responses
             if (Array.isArray(data)) {
                 data.forEach(project => {
@@ -110,6 +133,7 @@ function updateProjectStatus(project) {
         // Update action buttons based on status
         const startBtn = document.getElementById(`start-btn-${project.id}`);
         const stopBtn = document.getElementById(`stop-btn-${project.id}`);
+        const restartBtn = document.getElementById(`restart-btn-${project.id}`);
         
         if (startBtn && stopBtn) {
             if (project.status === 'running') {
@@ -120,6 +144,10 @@ function updateProjectStatus(project) {
                 stopBtn.disabled = true;
             }
         }
+        
+        if (restartBtn && !restartBtn.dataset.busy) {
+            restartBtn.disabled = project.status !== 'running';
+        }
     }
 }
 
@@ -169,6 +197,73 @@ function stopProject(projectId) {
     });
 }
 
+function rollingRestartProject(projectId) {
+    const restartBtn = document.getElementById(`restart-btn-${projectId}`);
+    if (restartBtn) {
+        restartBtn.disabled = true;
+        restartBtn.dataset.busy = 'true';
+    }
+    
+    const finish = () => {
+        if (restartBtn) {
+            delete restartBtn.dataset.busy;
+            restartBtn.disabled = false;
+        }
+    };
+    
+    // The restart runs in the background on the server, so poll until it is done
+    const poll = () => {
+        fetch(`/api/project/${projectId}/rolling-restart`)
+            .then(response => response.json())
+            .then(data => {
+                if (data.success && data.in_progress) {
+                    setTimeout(poll, 1000);
+                    return;
+                }
+                finish();
+                const result = data.result || data;
+                if (result.success) {
+                    const dropped = result.dropped_requests === null ? 'dropped requests not measured' : `${result.dropped_requests} dropped`;
+                    showToast('Success', `${result.message} (downtime ${result.downtime_ms} ms, ${dropped})`, 'success');
+                    // Reload so the details page shows the new process and restart report
+                    if (document.getElementById('project-details')) {
+                        window.location.reload();
+                    } else {
+                        refreshProjectStatuses();
+                    }
+                } else {
+                    showToast('Error', result.message, 'danger');
+                }
+            })
+            .catch(error => {
+                finish();
+                console.error('Error checking rolling restart:', error);
+                showToast('Error', 'Failed to check the rolling restart', 'danger');
+            });
+    };
+    
+    fetch(`/api/project/${projectId}/rolling-restart`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            poll();
+        } else {
+            finish();
+            showToast('Error', data.message, 'danger');
+        }
+    })
+    .catch(error => {
+        finish();
+        console.error('Error restarting project:', error);
+        showToast('Error', 'Failed to restart project', 'danger');
+    });
+}
+
 function removeProject(projectId) {
     if (!confirm('Are you sure you want to remove this project?')) {
         return;
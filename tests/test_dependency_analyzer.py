@@ -0,0 +1,101 @@
+import unittest
+
+from dependency_analyzer import DependencyAnalyzer, _poetry_constraint, parse_requirements
+
+
+def requirement(specifier, marker=None, source='requirements.txt'):
+    return {'source': source, 'specifier': specifier, 'marker': marker}
+
+
+def package(required, installed=None, locked=None, optional=False):
+    return {'name': 'demo', 'required': required, 'installed': installed, 'locked': locked, 'optional': optional}
+
+
+class ParseRequirementsTest(unittest.TestCase):
+
+    def parse(self, text):
+        unparsed = []
+        specs = parse_requirements(text, unparsed=unparsed)
+        return [(spec['name'], spec['specifier']) for spec in specs], unparsed
+
+    def test_plain_lines_and_comments(self):
+        specs, unparsed = self.parse('# pinned\nflask==3.0.0\n\nclick>=8  # cli\n')
+        self.assertEqual(specs, [('flask', '==3.0.0'), ('click', '>=8')])
+        self.assertEqual(unparsed, [])
+
+    def test_hashes_and_continuations(self):
+        text = ('flask==3.0.0 \\\n'
+                '    --hash=sha256:aaa \\\n'
+                '    --hash=sha256:bbb\n'
+                'requests==2.0 --hash=sha256:ccc\n'
+                'click>=8\n')
+        specs, unparsed = self.parse(text)
+        self.assertEqual(specs, [('flask', '==3.0.0'), ('requests', '==2.0'), ('click', '>=8')])
+        self.assertEqual(unparsed, [])
+
+    def test_markers_are_kept(self):
+        specs = parse_requirements('tomli>=1; python_version < "3.11"\n')
+        self.assertEqual(specs[0]['marker'], 'python_version < "3.11"')
+
+    def test_global_options_are_skipped(self):
+        specs, unparsed = self.parse('--index-url https://example.org/simple\nflask\n')
+        self.assertEqual(specs, [('flask', '')])
+        self.assertEqual(unparsed, [])
+
+    def test_unanalyzable_lines_are_reported(self):
+        specs, unparsed = self.parse('-r base.txt\n-e .\n./vendor/pkg\nflask\n')
+        self.assertEqual(specs, [('flask', '')])
+        self.assertEqual(unparsed, ['-r base.txt', '-e .', './vendor/pkg'])
+
+
+class PoetryConstraintTest(unittest.TestCase):
+
+    def test_caret(self):
+        self.assertEqual(_poetry_constraint('^1.2.3'), '>=1.2.3,<2')
+        self.assertEqual(_poetry_constraint('^0.2.3'), '>=0.2.3,<0.3')
+        self.assertEqual(_poetry_constraint('^0.0.3'), '>=0.0.3,<0.0.4')
+
+    def test_tilde(self):
+        self.assertEqual(_poetry_constraint('~1.2.3'), '>=1.2.3,<1.3')
+        self.assertEqual(_poetry_constraint('~1'), '>=1,<2')
+
+    def test_pep440_and_exact(self):
+        self.assertEqual(_poetry_constraint('~=1.2'), '~=1.2')
+        self.assertEqual(_poetry_constraint('>=1.0, <2.0'), '>=1.0,<2.0')
+        self.assertEqual(_poetry_constraint('1.4.0'), '==1.4.0')
+        self.assertEqual(_poetry_constraint('*'), '')
+
+
+class PackageStatusTest(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = DependencyAnalyzer()
+
+    def status(self, package, installed=None, environment=None):
+        return self.analyzer._package_status(package, installed if installed is not None else {}, environment)[0]
+
+    def test_ok_outdated_missing(self):
+        self.assertEqual(self.status(package([requirement('>=2')], installed='2.1')), 'ok')
+        self.assertEqual(self.status(package([requirement('>=2')], installed='1.9')), 'outdated')
+        self.assertEqual(self.status(package([requirement('>=2')])), 'missing')
+        self.assertEqual(self.status(package([requirement('>=2')], optional=True)), 'ok')
+
+    def test_conflicting_pins(self):
+        required = [requirement('==1.0'), requirement('==2.0', source='pyproject.toml')]
+        self.assertEqual(self.status(package(required, installed='1.0')), 'conflicting')
+
+    def test_lock_mismatch(self):
+        self.assertEqual(self.status(package([requirement('>=1')], installed='1.0', locked='1.1')), 'outdated')
+        self.assertEqual(self.status(package([requirement('<1')], installed='0.9', locked='1.1')), 'conflicting')
+
+    def test_unknown_without_installed_packages(self):
+        self.assertEqual(self.analyzer._package_status(package([requirement('>=1')]), None)[0], 'unknown')
+
+    def test_markers_use_the_project_environment(self):
+        old_python = package([requirement('>=1', marker='python_version < "3.9"')])
+        self.assertEqual(self.status(old_python, environment={'python_version': '3.8'}), 'missing')
+        self.assertEqual(self.status(old_python, environment={'python_version': '3.12'}), 'ok')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+import os
+import ast
+import logging
+import subprocess
+import time
+
+logger = logging.getLogger(__name__)
+
+# Directories that are never byte-compiled during a warm-up
+COMPILE_EXCLUDE = r'(^|/)(venv|\.venv|env|\.git|node_modules|__pycache__)(/|$)'
+
+# Run in the project's interpreter: imports each module and prints one line per failure.
+# Arguments are 'module' or 'module:name,name' for from-imports, which are imported the way
+# the from statement does, including submodules. It only uses modules loaded at startup so
+# their import time is not charged to the app, and uses __import__ because -X importtime
+# does not see importlib.import_module.
+IMPORT_CHECK_SCRIPT = '''
+import sys
+for spec in sys.argv[1:]:
+    name, _, names = spec.partition(":")
+    names = [n for n in names.split(",") if n]
+    try:
+        module = __import__(name, fromlist=names)
+        for attribute in names:
+            if not hasattr(module, attribute):
+                raise ImportError(f"cannot import name {attribute!r} from {name!r}")
+    except BaseException as e:
+        message = f"{type(e).__name__}: {e}".replace("\\n", " ")
+        print(f"{name}\\t{message}")
+print("WARMUP-DONE")
+'''
+
+
+def find_entry_imports(entry_file_path):
+    """Get the modules an entry file imports when it is loaded.
+
+    Returns import specs for IMPORT_CHECK_SCRIPT: the full dotted module name,
+    followed by ':' and the imported names for from-imports.
+
+    Only module-level imports are included, including those nested in if blocks.
+    Imports inside functions and classes run lazily, imports in try blocks are
+    usually optional, and relative imports need a package, so all are skipped.
+    """
+    with open(entry_file_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=entry_file_path)
+
+    modules = []
+
+    def visit(statements):
+        for node in statements:
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                imported = ','.join(alias.name for alias in node.names if alias.name != '*')
+                names = [f'{node.module}:{imported}' if imported else node.module]
+            else:
+                names = []
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    continue
+                fields = ('orelse', 'finalbody') if isinstance(node, ast.Try) else ('body', 'orelse', 'finalbody')
+                for field in fields:
+                    visit(getattr(node, field, []) or [])
+                for handler in getattr(node, 'handlers', []) or []:
+                    visit(handler.body)
+            for name in names:
+                if name not in modules and not name.startswith('__future__'):
+                    modules.append(name)
+
+    visit(tree.body)
+    return modules
+
+
+def module_name(spec):
+    """Get the module name of an import spec from find_entry_imports."""
+    return spec.partition(':')[0]
+
+
+def parse_importtime(output, modules):
+    """Parse `-X importtime` output into the import time of each requested package.
+
+    Entries indented below another import were triggered by it and are already
+    in its cumulative time, so only unindented entries are counted. Submodules
+    such as `email.message` are added to their top-level package. Times are in
+    milliseconds.
+    """
+    packages = {module_name(module).split('.')[0] for module in modules}
+    timings = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|', 2)
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, name = parts
+        if not self_us.strip().isdigit() or name[1:2] == ' ':
+            continue
+        top_level = name.strip().split('.')[0]
+        if top_level not in packages:
+            continue
+        timing = timings.setdefault(top_level, {'module': top_level, 'self_ms': 0, 'cumulative_ms': 0})
+        timing['self_ms'] = round(timing['self_ms'] + int(self_us) / 1000, 1)
+        timing['cumulative_ms'] = round(timing['cumulative_ms'] + int(cumulative_us) / 1000, 1)
+    return list(timings.values())
+
+
+def compile_project(python_path, path, timeout=300):
+    """Byte-compile a project's sources with its own interpreter.
+
+    Runs on '.' from inside the project so COMPILE_EXCLUDE only sees relative
+    paths and a project below a directory named e.g. env is still compiled.
+    """
+    process = subprocess.run(
+        [python_path, '-m', 'compileall', '-q', '-x', COMPILE_EXCLUDE, '.'],
+        cwd=path,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        timeout=timeout
+    )
+    return process.returncode == 0, process.stdout.splitlines()
+
+
+def check_imports(python_path, path, modules, env=None, timeout=120):
+    """Import modules in a separate interpreter and time them.
+
+    Returns the import failures and the top-level import timings.
+    """
+    process = subprocess.run(
+        [python_path, '-X', 'importtime', '-c', IMPORT_CHECK_SCRIPT] + modules,
+        cwd=path,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        timeout=timeout
+    )
+
+    names = {module_name(module) for module in modules}
+    failures = {}
+    finished = False
+    for line in process.stdout.splitlines():
+        # The imported modules may print too, so only trust our own lines
+        name, _, message = line.partition('\t')
+        if name in names and message:
+            failures[name] = message
+        elif line == 'WARMUP-DONE':
+            finished = True
+    if not finished:
+        # The interpreter died before finishing, e.g. an import called os._exit()
+        failures['<interpreter>'] = f"Exited with code {process.returncode} before all imports were checked"
+
+    return failures, parse_importtime(process.stderr, modules)
+
+
+def run_warmup(python_path, path, entry_file, env=None, slowest=15):
+    """Precompile a project and check that its entry file's imports load.
+
+    Returns a summary with the compile result, import failures and the slowest
+    top-level imports.
+    """
+    started = time.time()
+    result = {
+        'success': False,
+        'compiled': False,
+        'compile_errors': [],
+        'import_errors': {},
+        'slowest_imports': [],
+        'total_import_ms': 0
+    }
+
+    try:
+        result['compiled'], result['compile_errors'] = compile_project(python_path, path)
+
+        entry_file_path = os.path.join(path, entry_file)
+        try:
+            modules = find_entry_imports(entry_file_path)
+        except (OSError, SyntaxError, ValueError) as e:
+            modules = []
+            result['import_errors'][entry_file] = f"{type(e).__name__}: {e}"
+
+        if modules:
+            failures, timings = check_imports(python_path, path, modules, env=env)
+            result['import_errors'].update(failures)
+            failed_packages = {name.split('.')[0] for name in failures}
+            timings = [timing for timing in timings if timing['module'] not in failed_packages]
+            result['total_import_ms'] = round(sum(timing['cumulative_ms'] for timing in timings), 1)
+            result['slowest_imports'] = sorted(timings, key=lambda timing: timing['cumulative_ms'], reverse=True)[:slowest]
+
+        result['success'] = result['compiled'] and not result['import_errors']
+    except subprocess.TimeoutExpired as e:
+        result['import_errors']['<timeout>'] = f"Timed out after {e.timeout}s"
+    except Exception as e:
+        logger.error(f"Error warming up {path}: {e}")
+        result['import_errors']['<error>'] = str(e)
+
+    result['duration_ms'] = round((time.time() - started) * 1000, 1)
+    result['finished'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    result['finished_at'] = time.time()
+    return result